@@ -9,10 +9,13 @@ State machine determines whether a state can be applied by calling
 States' is_applicable(). The method is expected to return True if the
 state can be applied right now or False if not.
 """
-import random
 import time
 from dataclasses import dataclass
 from statemachine import State, FinalState, StateMachine
+from statemachine.util import BitStream
+
+# Processing slot is available roughly every fourth time it is probed.
+slot_available = BitStream(p=0.25)
 
 
 @dataclass
@@ -37,7 +40,7 @@ class Processing(State[Data]):
 
         Simulates availability by randomly returning True (available) or False (busy).
         """
-        ready = random.randrange(1, 5) == 1
+        ready = slot_available.next()
         print(f"Ready to begin processing: {ready}")
         return ready
 
@@ -1,6 +1,7 @@
 import time
-import threading
 import logging
+import select
+import socket
 from statemachine import State, StateMachine
 
 
@@ -11,6 +12,48 @@ logging.basicConfig(
 logger = logging.getLogger("Door")
 
 
+class Waitable:
+    """Interruptible wait.
+
+    Works like threading.Event but waits on a socket pair with select()
+    against a monotonic deadline. Setting the waitable interrupts an ongoing
+    wait. The socket pair is created once and reused for every wait; call
+    close() to release it.
+    """
+
+    def __init__(self):
+        self._reader, self._writer = socket.socketpair()
+        self._reader.setblocking(False)
+        self._writer.setblocking(False)
+
+    def set(self):
+        try:
+            self._writer.send(b"\0")
+        except BlockingIOError:
+            # Socket buffer is full: the waitable is set already.
+            pass
+
+    def clear(self):
+        try:
+            while self._reader.recv(64):
+                pass
+        except BlockingIOError:
+            pass
+
+    def wait(self, timeout: float) -> bool:
+        """Wait until set or timeout expires. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while (remaining := deadline - time.monotonic()) > 0:
+            readable, _, _ = select.select([self._reader], [], [], remaining)
+            if readable:
+                return True
+        return False
+
+    def close(self):
+        self._reader.close()
+        self._writer.close()
+
+
 class Actuator:
     """Represents a physical actuator that opens and closes a door.
 
@@ -22,7 +65,7 @@ class Actuator:
     logger = logging.getLogger("Actuator")
 
     def __init__(self, stroke_duration=2.0):
-        self._ready = threading.Event()
+        self._ready = Waitable()
         self._duration = stroke_duration  # Stroke duration in seconds.
 
     def extend(self):
@@ -50,6 +93,10 @@ class Actuator:
         Actuator.logger.info("Stop.")
         self._ready.set()
 
+    def close(self):
+        """Release resources of the actuator."""
+        self._ready.close()
+
 
 class Opening(State[Actuator]):
     """State representing the door opening process."""
@@ -78,7 +125,7 @@ class Opened(State[Actuator]):
 
     def __init__(self, keep_open_duration: float = 2.0, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._close = threading.Event()
+        self._close = Waitable()
         self._keep_open_duration = keep_open_duration
 
     def prepare_entry(self, context: Actuator):
@@ -92,6 +139,10 @@ class Opened(State[Actuator]):
         self._close.wait(self._keep_open_duration)
         logger.info("Door can be closed.")
 
+    def close(self):
+        """Release resources of the state."""
+        self._close.close()
+
 
 class DoorStateMachine(StateMachine[Actuator]):
     """State machine controlling the door actuator.
@@ -147,7 +198,8 @@ class DoorStateMachine(StateMachine[Actuator]):
 
 
 # Instantiate the state machine with an actuator context
-door = DoorStateMachine(context=Actuator())
+actuator = Actuator()
+door = DoorStateMachine(context=actuator)
 door.start()
 
 # Wait for the first actual state to be applied. Without waiting,
@@ -158,19 +210,24 @@ door.wait(door.opening)
 # Without waiting the door begins closing before being opened.
 # door.wait(door.opened)
 
-# Trigger door closing in a separate thread. This demonstrates
-# a multithreading use case.
-threading.Thread(target=door.close).start()
+# Trigger door closing on the state machine's worker thread. This
+# demonstrates a multithreading use case without creating a thread per call.
+closing = door.submit(door.close)
 
 # Trigger open while the door is still closing. A short delay is used
 # to more likely avoid a situation where open() takes place before close().
+# Opening interrupts closing that is still running on the worker thread.
 time.sleep(0.2)
-threading.Thread(target=door.open).start()
+door.open()
 
 # Door remains opened for given time interval and then gets closed.
 # Timeout can be used to ensure the waiting ends in given timeout.
 door.wait(door.closed, timeout=8.0)
 
+# Calls not yet run by the worker are discarded on stop. Wait for the
+# submitted call to complete before stopping.
+closing.result(timeout=8.0)
+
 # Since there's no final state, we manually stop the state machine
 door.stop()
 
@@ -179,3 +236,7 @@ door.join()
 
 # Log the final state
 logger.info(f"Final state: {door.state}")
+
+# Release the sockets used for waiting.
+door.opened.close()
+actuator.close()
@@ -1,30 +1,16 @@
 from time import sleep
-from datetime import datetime
-from dataclasses import dataclass
-from statemachine import StateMachine, State
+from statemachine import StateMachine, State, TraceLog
 
 
-class Opened(State):
-    def on_entry(self, access_log: list):
-        # Log the time when the door enters the 'Opened' state
-        access_log.append(Entry(self.name, datetime.now().isoformat()))
-
-
-class Closed(State):
-    def on_entry(self, access_log: list):
-        # Log the time when the door enters the 'Closed' state
-        access_log.append(Entry(self.name, datetime.now().isoformat()))
-
-
-class Door(StateMachine[list]):
-    def __init__(self, access_log: list):
+class Door(StateMachine[TraceLog]):
+    def __init__(self, access_log: TraceLog):
         super().__init__(context=access_log)
 
         # Define states
-        self.closed = Closed("Closed")
+        self.closed = State("Closed")
         self.closing = State("Closing", lambda _: sleep(1.0))
         self.opening = State("Opening", lambda _: sleep(1.0))
-        self.opened = Opened("Opened")
+        self.opened = State("Opened")
         self.locked = State("Locked")
 
         # Define transitions
@@ -41,17 +27,16 @@ class Door(StateMachine[list]):
     def on_state_changed(self, from_state: State, to_state: State):
         print(f"State changed: {from_state} → {to_state}")
 
-
-@dataclass
-class Entry:
-    """Access log entry."""
-    event: str
-    when: str
+        # Log the time when the door enters the 'Opened' or 'Closed' state.
+        if to_state is self.opened or to_state is self.closed:
+            self.context.record(self.state_id(to_state))
 
 
-# Naive example of an access log. Access log is used as a state machine context.
-# Context objects may hold e.g., data, resources or control structures.
-access_log: list = []
+# Access log is used as a state machine context. TraceLog records state ids
+# and timestamps into a preallocated buffer - entries are created only when
+# the log is read. Context objects may hold e.g., data, resources or control
+# structures.
+access_log = TraceLog(capacity=100)
 
 # Instantiate and start the machine.
 door = Door(access_log)
@@ -76,5 +61,6 @@ door.stop()
 door.join()
 
 # Print the access log.
-for entry in access_log:
-    print(f"Event: {entry.event}, Time: {entry.when}")
+states = door.states()
+for entry in access_log.entries():
+    print(f"Event: {states[entry.state_id]}, Time: {entry.when}")
@@ -37,9 +37,12 @@ class DelayedState(State):
     def on_entry(self, context: T):
         # Wait for the delay to complete or for an early exit signal
         t = time.time()
-        logger.info(f"State gets completed in {self.delay} seconds - or on exit.")
-        self._completed.wait(self.delay)
-        logger.info(f"State was completed in {time.time() - t:.1f} seconds.")
+        logger.info("State gets completed in %s seconds - or on exit.", self.delay)
+        # is_set() reads the flag without taking the event's lock. The state
+        # may have been exited already by the time on_entry() is called.
+        if not self._completed.is_set():
+            self._completed.wait(self.delay)
+        logger.info("State was completed in %.1f seconds.", time.time() - t)
 
 
 class ExampleMachine(StateMachine):
@@ -68,7 +71,7 @@ class ExampleMachine(StateMachine):
 
     def on_state_changed(self, from_state: State, to_state: State):
         """Log every state transition."""
-        logger.info(f"State changed: {from_state} → {to_state}.")
+        logger.info("State changed: %s → %s.", from_state, to_state)
 
 
 # Instantiate and start the state machine
@@ -1,3 +1,14 @@
+import os
+
 from setuptools import setup
 
-setup()
+ext_modules = []
+
+# Optionally compile the transition dispatch ahead of time with mypyc:
+#   STATEMACHINE_USE_MYPYC=1 pip install --no-build-isolation .
+if os.environ.get("STATEMACHINE_USE_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify(["src/statemachine/_runner.py"])
+
+setup(ext_modules=ext_modules)
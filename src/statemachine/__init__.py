@@ -1,7 +1,4 @@
-from typing import TypeVar
-
-T = TypeVar("T")
-
+from ._typing import T
 from ._version import __version__
 from .errors import *
 from .state import State
@@ -11,3 +8,5 @@ from .state import AnyState
 from .transition import Transition
 from .transition import GlobalTransition
 from .statemachine import StateMachine
+from .trace import TraceEntry
+from .trace import TraceLog
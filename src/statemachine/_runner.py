@@ -0,0 +1,68 @@
+"""Transition dispatch used by the state machine control loop.
+
+The module is kept strictly typed and free of dynamic features so that it
+can be compiled ahead of time with mypyc (see setup.py). The pure Python
+module is used when the compiled one is not available.
+"""
+
+import logging
+from typing import Callable
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+
+from .state import AnyState
+from .state import State
+from .transition import Transition
+
+logger = logging.getLogger("StateMachine")
+
+
+def build_automatic_table(
+    state_ids: Mapping[State, int],
+    transitions: Sequence[Transition],
+    is_checked_on_dispatch: Callable[[Transition], bool],
+) -> tuple[list[list[Transition]], list[Transition]]:
+    """Build a jump table of automatic transitions.
+
+    Returns a table holding a list of automatic transitions for each state,
+    indexed by the state id given in state_ids, and a list of global
+    automatic transitions.
+    Transitions are listed in the given order - global transitions included.
+
+    Transitions whose source states are checked only on dispatch are listed
+    for every state, like global transitions.
+    """
+    table: list[list[Transition]] = [[] for _ in range(len(state_ids))]
+    global_transitions: list[Transition] = []
+
+    for t in transitions:
+        if is_checked_on_dispatch(t) or any(
+            isinstance(s, AnyState) for s in t.from_states
+        ):
+            global_transitions.append(t)
+            for row in table:
+                row.append(t)
+        else:
+            for s in t.from_states:
+                state_id = state_ids.get(s)
+                if state_id is not None:
+                    table[state_id].append(t)
+
+    return table, global_transitions
+
+
+def select_transition(
+    candidates: Sequence[Transition], is_possible: Callable[[Transition], bool]
+) -> Optional[Transition]:
+    """Select the first possible transition from the candidates.
+
+    Errors raised by the check are logged and the transition is skipped.
+    """
+    for t in candidates:
+        try:
+            if is_possible(t):
+                return t
+        except Exception as error:
+            logger.exception(error)
+    return None
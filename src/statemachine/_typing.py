@@ -0,0 +1,4 @@
+from typing import TypeVar
+
+# Type of the state machine context.
+T = TypeVar("T")
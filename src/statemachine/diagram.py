@@ -1,16 +1,19 @@
 import logging
-import textwrap
+import os
 import time
-import webbrowser
 from string import Template
-from tempfile import NamedTemporaryFile
 from typing import Optional
 
 from statemachine import InitialState
+from statemachine import State
 from statemachine import StateMachine
 
 logger = logging.getLogger(__name__)
 
+# Time given to the web browser to render a diagram file before the file
+# gets deleted at exit.
+_RENDER_TIME = 3.0
+
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html>
@@ -32,6 +35,10 @@ $diagram
 </html>
 """
 
+# Default template split around its placeholders once at import.
+_HTML_HEAD, _, _HTML_REST = HTML_TEMPLATE.partition("$name")
+_HTML_MIDDLE, _, _HTML_TAIL = _HTML_REST.partition("$diagram")
+
 
 def show_state_diagram(state_machine: StateMachine, name: Optional[str] = None):
     """Render and open state diagram on a web browser.
@@ -45,7 +52,8 @@ def show_state_diagram(state_machine: StateMachine, name: Optional[str] = None):
 
     # Create text based state diagram.
     state_diagram = create_state_diagram(state_machine)
-    logger.debug(state_diagram)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(state_diagram)
 
     # Create HTML page with embedded state diagram.
     html = _create_html_page_with_state_diagram(name, state_diagram)
@@ -70,40 +78,44 @@ def create_state_diagram(state_machine: StateMachine) -> str:
     transitions = []
     initial_state_handled = False
 
+    # Ids by state. A state is in a number of transitions but its id is
+    # formatted once.
+    ids: dict[State, str] = {}
+
+    def state_id(state: State) -> str:
+        if (state_id_str := ids.get(state)) is None:
+            state_id_str = ids[state] = _get_id(state.name)
+        return state_id_str
+
     for t in state_machine.transitions():
-        to_state_id = _get_id(t.to_state.name)
+        to_state = t.to_state
+
+        # Target and label are the same for all the source states.
+        target = "[*]" if to_state.final else state_id(to_state)
+
+        if t.name or t.automatic:
+            label = f" : {t.name or ''}{' [auto]' if t.automatic else ''}"
+        else:
+            label = ""
 
         for from_state in t.from_states:
             if from_state is initial_state and not initial_state_handled:
                 if isinstance(from_state, InitialState):
-                    line = f"[*] --> "
+                    source = "[*]"
                 else:
-                    from_state_id = _get_id(from_state.name)
-                    state_names_by_ids[from_state_id] = from_state.name
-                    line = f"[*] --> {from_state_id}\n"
-                    line += f"{from_state_id} --> "
+                    source = state_id(from_state)
+                    state_names_by_ids[source] = from_state.name
+                    transitions.append(f"[*] --> {source}")
                 initial_state_handled = True
             else:
-                from_state_id = _get_id(from_state.name)
-                state_names_by_ids[from_state_id] = from_state.name
-                line = f"{from_state_id} --> "
-
-            if t.to_state.final:
-                line += "[*]"
-            else:
-                state_names_by_ids[to_state_id] = t.to_state.name
-                line += f"{to_state_id}"
-
-            if t.name or t.automatic:
-                line += " : "
+                source = state_id(from_state)
+                state_names_by_ids[source] = from_state.name
 
-            if t.name:
-                line += t.name
+            if not to_state.final:
+                state_names_by_ids[target] = to_state.name
 
-            if t.automatic:
-                line += " [auto]"
-
-            transitions.append(line)
+            # Each line is formatted in one go.
+            transitions.append(f"{source} --> {target}{label}")
 
     state_definitions = [f"{id}: {name}" for id, name in state_names_by_ids.items()]
     return "\n".join(state_definitions + [""] + transitions)
@@ -118,7 +130,12 @@ def _create_html_page_with_state_diagram(
     name: str, diagram: str, template: str = HTML_TEMPLATE
 ):
     """Create a HTML page with given state diagram."""
-    indented_text = textwrap.indent(diagram, " " * 6)
+    # Same as textwrap.indent(): whitespace only lines are not indented.
+    indented_text = "\n".join(
+        f"      {line}" if line.strip() else line for line in diagram.split("\n")
+    )
+    if template is HTML_TEMPLATE:
+        return "".join((_HTML_HEAD, name, _HTML_MIDDLE, indented_text, _HTML_TAIL))
     return Template(template).safe_substitute(name=name, diagram=indented_text)
 
 
@@ -128,23 +145,38 @@ def _open_with_web_browser(content: str, suffix: str = ".html", delete: bool = T
     Creates a temporary HTML file. Writes the given HTML content into the file
     and open the temporary file with web browser.
 
-    The temporary file gets deleted by default. Use `delete=False` to preserve the file.
+    The temporary file gets deleted at exit by default. Use `delete=False` to
+    preserve the file.
     """
-    with NamedTemporaryFile(
-        delete=delete, suffix=suffix, mode="w", encoding="utf-8"
-    ) as fh:
+    # Imported on use only, creating diagrams does not need these.
+    import atexit
+    import tempfile
+
+    # mkstemp() creates the file exclusively under a random name.
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix="statemachine_diagram_")
+    with os.fdopen(fd, mode="w", encoding="utf-8") as fh:
         fh.write(content)
-        fh.flush()
 
-        logger.debug("State diagram written to %s.", fh.name)
+    logger.debug("State diagram written to %s.", path)
 
-        _open_web_page(fh.name)
+    _open_web_page(path)
 
-        # We give some time to the web browser to render the page before
-        # exiting the context and the temporary file gets deleted.
-        time.sleep(3.0 if delete else 0.0)
+    if delete:
+        atexit.register(_remove_file, path, time.monotonic() + _RENDER_TIME)
+
+
+def _remove_file(path: str, not_before: float):
+    """Remove a file, giving the web browser time to render it first."""
+    # Only a process exiting right after opening a diagram has to wait.
+    time.sleep(max(0.0, not_before - time.monotonic()))
+    try:
+        os.remove(path)
+    except OSError:
+        pass
 
 
 def _open_web_page(filename: str):
     """Open a file on a web browser."""
+    import webbrowser
+
     webbrowser.open(f"file:///{filename}")
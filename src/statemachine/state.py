@@ -1,10 +1,11 @@
 import itertools
 import logging
+import sys
 from typing import Generic
 from typing import Optional
 from typing import Callable
 
-from . import T
+from ._typing import T
 from .errors import FinalStateReached
 
 
@@ -32,6 +33,15 @@ class State(Generic[T]):
                 pass
     """
 
+    # __dict__ keeps subclasses and instances free to add attributes.
+    __slots__ = (
+        "name",
+        "final",
+        "_callback",
+        "__dict__",
+        "__weakref__",
+    )
+
     _name: Optional[str] = None
     _state_counter = itertools.count(1)
 
@@ -41,10 +51,12 @@ class State(Generic[T]):
         callback: Optional[Callback_Type] = None,
         final: bool = False,
     ):
-        state_number = next(self._state_counter)
-        self.name = name or self._name or f"S{state_number}"
+        # States are numbered only when they get no other name.
+        name = name or self._name or f"S{next(State._state_counter)}"
+        # Interned names compare by identity in dict and set lookups.
+        self.name = sys.intern(name)
         self.final = final
-        self._callback = (lambda _: None) if callback is None else callback
+        self._callback = callback
 
     def __init_subclass__(cls, name=None):
         cls._name = name or cls.__name__
@@ -93,7 +105,8 @@ class State(Generic[T]):
         The `prepare_entry()` method is guaranteed to be called before either
         `on_entry()` or `on_exit()`.
         """
-        self._callback(context)
+        if self._callback is not None:
+            self._callback(context)
 
     def on_exit(self, context: T):
         """Called before state machine exits this state.
@@ -115,6 +128,8 @@ class State(Generic[T]):
 class InitialState(State):
     """Default initial state."""
 
+    __slots__ = ()
+
 
 class FinalState(State):
     """A default final state that terminates the state machine when entered.
@@ -131,6 +146,8 @@ class FinalState(State):
         name (str): Optional name for the final state. Defaults to "Final".
     """
 
+    __slots__ = ()
+
     def __init__(self, name: str = "Final"):
         super().__init__(name=name, final=True)
 
@@ -141,8 +158,13 @@ class AnyState(State):
     Used by GlobalTransition.
     """
 
+    __slots__ = ()
+
     def __eq__(self, other):
         return isinstance(other, State)
 
+    # Defining __eq__ would otherwise make AnyState unhashable.
+    __hash__ = State.__hash__
+
     def __repr__(self):
         return "*"
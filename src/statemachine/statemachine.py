@@ -1,14 +1,20 @@
 import logging
+import queue
 import threading
 import time
-import types
+from concurrent.futures import Future
 from threading import Lock
 from threading import RLock
 from traceback import format_tb
+from typing import Any
+from typing import Callable
 from typing import Generic
 from typing import Optional
+from typing import Sequence
 
-from . import T
+from ._typing import T
+from ._runner import build_automatic_table
+from ._runner import select_transition
 from .errors import AlreadyStartedError
 from .errors import ConfigurationError
 from .errors import ErrorInfo
@@ -20,6 +26,7 @@ from .errors import NotAliveError
 from .errors import StateError
 from .errors import TransitionError
 from .errors import StateMachineBusyError
+from .state import AnyState
 from .state import InitialState
 from .state import State
 from .transition import Callback_Type
@@ -28,6 +35,8 @@ from .transition import Transition
 
 logger = logging.getLogger("StateMachine")
 
+_Selector = Callable[[Callable[[Transition], bool]], Optional[Transition]]
+
 
 class StateMachine(Generic[T]):
     """State machine.
@@ -47,10 +56,61 @@ class StateMachine(Generic[T]):
         ...
         state_machine.stop()
         state_machine.join()
+
+    Lifecycle:
+        Building: states and transitions are connected.
+        Running: start() freezes transitions and starts the control loop.
+            Transitions cannot be added anymore.
+        Stopped: final state is reached or stop() is called.
+
+    Logging:
+        Transitions are traced with debug messages only if debug logging of
+        the "StateMachine" logger is enabled when the state machine is
+        created. Configure logging before creating the state machine.
     """
 
+    # __dict__ keeps subclasses free to add attributes, e.g. states and transitions.
+    __slots__ = (
+        "_context",
+        "_outer_lock",
+        "_inner_lock",
+        "_control_thread",
+        "_state_changed_condition",
+        "_run",
+        "_stop",
+        "_state_applied",
+        "_initial_state",
+        "_current_state",
+        "_transitions",
+        "_states",
+        "_state_ids",
+        "_automatic_table",
+        "_global_automatic_transitions",
+        "_automatic_selectors",
+        "_global_automatic_selector",
+        "_wake_up",
+        "_worker",
+        "_worker_lock",
+        "_submitted",
+        "_state_changed_hook",
+        "_state_applied_hook",
+        "_error_hook",
+        "_debug",
+        "_context_version",
+        "_applicability_cache",
+        "_applicability_cache_version",
+        "__dict__",
+        "__weakref__",
+    )
+
     def __init__(self, context: Optional[T] = None):
-        self.context: Optional[T] = context
+        self._context: Optional[T] = context
+
+        # Debug logging on the transition path is bound once: a no-op unless
+        # debug logging is enabled when the state machine is created.
+        self._debug: Callable[..., None] = (
+            logger.debug if logger.isEnabledFor(logging.DEBUG) else _no_op
+        )
 
         # Only one thread is allowed to call on_exit() or on_entry() for a state
         # at the same time. These methods are called in subsequent order for a state.
@@ -67,8 +127,50 @@ class StateMachine(Generic[T]):
         self._state_applied = threading.Event()
         self._initial_state: State = InitialState(name="InitialState")
         self._current_state: State = self.initial_state
-        self._transitions: list[Transition] = []
-        self._wait_interval = 0.1  # seconds
+        self._transitions: list[Transition] | tuple[Transition, ...] = []
+        # Connected states indexed by state id and state ids by state.
+        # State ids are assigned per state machine, see state_id().
+        self._states: list[State] = []
+        self._state_ids: dict[State, int] = {}
+        # Automatic transitions indexed by state id of the source state.
+        # Built lazily by _build_automatic_table() when first needed.
+        self._automatic_table: Optional[Sequence[Sequence[Transition]]] = None
+        self._global_automatic_transitions: Sequence[Transition] = []
+        # Generated functions selecting the next automatic transition,
+        # indexed by state id. Generated on start by _freeze().
+        self._automatic_selectors: Optional[tuple[_Selector, ...]] = None
+        self._global_automatic_selector: Optional[_Selector] = None
+        # Wakes up the control loop to evaluate automatic transitions.
+        self._wake_up = threading.Event()
+
+        # Worker thread running callables given to submit(). Started lazily.
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = Lock()
+        self._submitted: queue.SimpleQueue = queue.SimpleQueue()
+
+        # Hooks are resolved once. None if the hook is not overridden from
+        # the default, empty implementation and calling it can be skipped.
+        self._state_changed_hook: Optional[Callable[[State, State], None]] = (
+            self._call_on_state_changed
+            if _is_overridden(self, StateMachine, "on_state_changed")
+            else None
+        )
+        self._state_applied_hook: Optional[Callable[[State], None]] = (
+            self._call_on_state_applied
+            if _is_overridden(self, StateMachine, "on_state_applied")
+            else None
+        )
+        self._error_hook: Optional[Callable[[ErrorInfo], Optional[State]]] = (
+            self._handle_error
+            if _is_overridden(self, StateMachine, "handle_error")
+            else None
+        )
+
+        # Context version is bumped on every state change. Results of
+        # Transition.is_applicable() are cached per context version.
+        self._context_version = 0
+        self._applicability_cache: dict[object, bool] = {}
+        self._applicability_cache_version = 0
 
     def __str__(self):
         return self.__class__.__name__
@@ -76,6 +178,21 @@ class StateMachine(Generic[T]):
     def __contains__(self, state: State):
         return self.state is state
 
+    @property
+    def context(self) -> Optional[T]:
+        """Context given to the states and the transition callbacks.
+
+        Assigning a new context works like context_changed(): cached results
+        of `is_applicable()` are invalidated and automatic transitions are
+        re-evaluated.
+        """
+        return self._context
+
+    @context.setter
+    def context(self, context: Optional[T]):
+        self._context = context
+        self.context_changed()
+
     @property
     def initial_state(self) -> State:
         return self._initial_state
@@ -170,7 +287,7 @@ class StateMachine(Generic[T]):
             name=name,
             callback=callback,
         )
-        setattr(transition, "trigger", types.MethodType(self.trigger, transition))
+        transition._state_machine = self
 
         return transition
 
@@ -185,23 +302,148 @@ class StateMachine(Generic[T]):
         transition: Transition = GlobalTransition(
             to_state=to_state, automatic=automatic, name=name, callback=callback
         )
-        setattr(transition, "trigger", types.MethodType(self.trigger, transition))
+        transition._state_machine = self
         return transition
 
     def add_transition(self, transition: Transition):
-        """Register a transition object."""
+        """Register a transition object.
+
+        The state machine becomes the owner of a transition not created by
+        create_transition() or create_global_transition(), so that calling
+        the transition triggers it on this state machine. A transition owned
+        by another state machine cannot be added.
+        """
         if not isinstance(transition, Transition):
             raise ValueError(f"Expecting Transition but got {transition}.")
-        self._transitions.append(transition)
 
-    def transitions(self) -> list[Transition]:
-        """Get transitions as a list."""
+        transitions = self._transitions
+        if isinstance(transitions, tuple):
+            raise AlreadyStartedError(
+                "Transitions cannot be added after the state machine is started."
+            )
+
+        if transition._state_machine is None:
+            transition._state_machine = self
+        elif transition._state_machine is not self:
+            raise ConfigurationError(
+                f"Transition '{transition.name}' belongs to another state machine."
+            )
+
+        for state in transition.from_states:
+            if not isinstance(state, AnyState):
+                self._register_state(state)
+        self._register_state(transition.to_state)
+
+        # Transitions using the default is_applicable() ask the target state
+        # and share the cached result for that state.
+        if not _is_overridden(transition, Transition, "is_applicable"):
+            transition._applicability_key = transition.to_state
+
+        transitions.append(transition)
+        self._automatic_table = None
+
+    def _register_state(self, state: State):
+        """Assign a state id for a connected state."""
+        if state not in self._state_ids:
+            self._state_ids[state] = len(self._states)
+            self._states.append(state)
+
+    def state_id(self, state: State) -> Optional[int]:
+        """Get id of a connected state.
+
+        State ids are assigned in the order the states are connected and they
+        index states(). Returns None if the state is not connected to this
+        state machine, e.g., a state returned by the error handler.
+        """
+        return self._state_ids.get(state)
+
+    def transitions(self) -> Sequence[Transition]:
+        """Get transitions in the order they were added.
+
+        Returns a list until the state machine is started and a tuple after
+        that, since start() freezes the transitions.
+        """
         return self._transitions
 
+    def states(self) -> list[State]:
+        """Get connected states as a list indexed by state id."""
+        return self._states
+
     def _automatic_transitions(self) -> list[Transition]:
         """Get automatic transitions."""
         return [t for t in self.transitions() if t.automatic]
 
+    def _build_automatic_table(self) -> Sequence[Sequence[Transition]]:
+        """Build a jump table of automatic transitions indexed by state id."""
+        table, global_transitions = build_automatic_table(
+            self._state_ids,
+            self._automatic_transitions(),
+            self._is_checked_on_dispatch,
+        )
+        self._global_automatic_transitions = global_transitions
+        self._automatic_table = table
+        return table
+
+    def _is_checked_on_dispatch(self, transition: Transition) -> bool:
+        """Is the transition checked with can_transition() on dispatch.
+
+        The jump table and the bitmask follow from_states. A transition with
+        an overridden can_transition_from(), or any transition of a state
+        machine with an overridden can_transition(), is listed for every
+        state and checked with can_transition() instead.
+        """
+        return _is_overridden(self, StateMachine, "can_transition") or _is_overridden(
+            transition, Transition, "can_transition_from"
+        )
+
+    def _is_possible(self, transition: Transition) -> bool:
+        """Check a candidate selected from the jump table."""
+        if self._is_checked_on_dispatch(transition):
+            return self.can_transition(transition)
+        return self._is_applicable(transition)
+
+    def _automatic_transitions_from(self, state: State) -> Sequence[Transition]:
+        """Get automatic transitions from the given state."""
+        table = self._automatic_table
+        if table is None:
+            table = self._build_automatic_table()
+        state_id = self._state_ids.get(state)
+        if state_id is None:
+            # State is not connected, e.g., a state returned by the error handler.
+            return self._global_automatic_transitions
+        return table[state_id]
+
+    def _freeze(self):
+        """Freeze transitions into tuples.
+
+        Transitions are read-only after start. Tuples prevent adding more.
+        Source states of the transitions are frozen too, they may have been
+        modified since the transitions were added.
+        """
+        for transition in self._transitions:
+            transition.from_states = tuple(transition.from_states)
+            for state in transition.from_states:
+                if not isinstance(state, AnyState):
+                    self._register_state(state)
+            if transition._state_machine is self and not _is_overridden(
+                transition, Transition, "can_transition_from"
+            ):
+                transition._source_mask = _source_mask(transition, self._state_ids)
+
+        table = self._build_automatic_table()
+        self._automatic_table = tuple(tuple(row) for row in table)
+        self._global_automatic_transitions = tuple(self._global_automatic_transitions)
+        self._transitions = tuple(self._transitions)
+
+        checked, can_transition = self._is_checked_on_dispatch, self.can_transition
+        self._automatic_selectors = tuple(
+            _compile_selector(row, checked, can_transition)
+            for row in self._automatic_table
+        )
+        self._global_automatic_selector = _compile_selector(
+            self._global_automatic_transitions, checked, can_transition
+        )
+
     def is_alive(self) -> bool:
         """Is state machine alive.
 
@@ -217,6 +459,8 @@ class StateMachine(Generic[T]):
         return not self._run.is_set()
 
     def _log_states(self):
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         lines = [f"{self} states and transitions:"]
         for t in self.transitions():
             from_states = f"[{', '.join([str(s) for s in t.from_states])}]"
@@ -250,7 +494,8 @@ class StateMachine(Generic[T]):
                 "Use 'state_machine.connect(self.initial_state, other_state)' to connect."
             )
 
-        self._current_state = self.initial_state
+        self._freeze()
+        self._set_state(self.initial_state)
         self._log_states()
 
         controller = self._control_loop
@@ -258,7 +503,7 @@ class StateMachine(Generic[T]):
         self.on_start()
 
         try:
-            self._current_state.on_entry(self.context)
+            self._current_state.on_entry(self._context)
         except FinalStateReached:
             controller = lambda: None
 
@@ -268,7 +513,12 @@ class StateMachine(Generic[T]):
         self._control_thread.start()
 
     def stop(self):
-        """Stop state machine."""
+        """Stop state machine.
+
+        Callables given to submit() that have not started running yet are
+        discarded and their futures cancelled. A callable already running
+        is completed; join() waits for it.
+        """
         logger.debug("Stop state machine.")
 
         if self._stop.is_set():
@@ -278,6 +528,7 @@ class StateMachine(Generic[T]):
             raise NotAliveError
 
         self._stop.set()
+        self._wake_up.set()
 
     def join(self, timeout: Optional[float] = None) -> bool:
         """Wait state machine to get completed.
@@ -288,8 +539,18 @@ class StateMachine(Generic[T]):
         logger.debug("Waiting control loop to get completed.")
         if self._control_thread is None:
             raise NotAliveError
+        timer = _CountdownTimer(timeout)
         self._control_thread.join(timeout=timeout)
-        return not self._control_thread.is_alive()
+        if self._control_thread.is_alive():
+            return False
+
+        # Worker is stopped after the control loop. A submitted callable may
+        # also call join() - the worker cannot wait for itself.
+        worker = self._worker
+        if worker is None or worker is threading.current_thread():
+            return True
+        worker.join(timeout=timer.time_left)
+        return not worker.is_alive()
 
     def wait_next_state(self, timeout: Optional[float] = None) -> bool:
         """
@@ -306,21 +567,16 @@ class StateMachine(Generic[T]):
         The return value is True unless a given timeout expired, in which case it is False.
         """
         target_states = states if isinstance(states, list) else [states]
-        timer = _CountdownTimer(timeout)
+        self._debug("Waiting %s to occur. Timeout is set as %s.", states, timeout)
 
-        while not self.state in target_states:
-            logger.debug(
-                "Waiting %s to occur. Timeout is set as %s." % (states, timeout)
+        # The state is checked while holding the condition. A state change
+        # notifies only after acquiring it, so no change can be missed
+        # between the check and the wait.
+        with self._state_changed_condition:
+            return self._state_changed_condition.wait_for(
+                lambda: self._current_state in target_states, timeout
             )
 
-            if self.wait_next_state(timer.time_left) is False:
-                return False
-
-            if timer.expired():
-                return False
-
-        return True
-
     def halt(self):
         """Halt the state machine momentarily.
 
@@ -346,9 +602,47 @@ class StateMachine(Generic[T]):
 
         Checks if a state transition is valid and possible at this moment.
         """
-        return transition.can_transition_from(self.state) and transition.is_applicable(
-            self.context
-        )
+        return self._can_transition_from(
+            transition, self.state
+        ) and transition.is_applicable(self._context)
+
+    def _can_transition_from(self, transition: Transition, state: State) -> bool:
+        """Check if transition is possible from the given state.
+
+        Uses the source state bitmask of the transition if available. The
+        bits are state ids of the state machine owning the transition, so the
+        mask is not used for a transition of another state machine.
+        """
+        mask = transition._source_mask
+        state_id = self._state_ids.get(state)
+        if mask is None or state_id is None or transition._state_machine is not self:
+            return transition.can_transition_from(state)
+        return mask >> state_id & 1 == 1
+
+    def context_changed(self):
+        """Notify the state machine about a change in the context.
+
+        Results of `is_applicable()` are cached until the next state change.
+        Call this if the context is changed outside of state transitions in
+        a way that affects applicability of the states. Invalidates the cached
+        results and wakes up the control loop to re-evaluate automatic
+        transitions.
+        """
+        self._context_version += 1
+        self._wake_up.set()
+
+    def _is_applicable(self, transition: Transition) -> bool:
+        """Check if transition is applicable using cached results."""
+        cache = self._applicability_cache
+        if self._applicability_cache_version != self._context_version:
+            cache.clear()
+            self._applicability_cache_version = self._context_version
+
+        key = transition._applicability_key
+        applicable = cache.get(key)
+        if applicable is None:
+            applicable = cache[key] = transition.is_applicable(self._context)
+        return applicable
 
     def get_next_transition(self) -> Optional[Transition]:
         """Get next transition.
@@ -356,13 +650,16 @@ class StateMachine(Generic[T]):
         Responsible to determine and return the next transition or None if
         no transition is available.
         """
-        for t in self._automatic_transitions():
-            try:
-                if self.can_transition(t):
-                    return t
-            except Exception as error:
-                logger.exception(error)
-        return None
+        selectors = self._automatic_selectors
+        if selectors is None or self._global_automatic_selector is None:
+            return select_transition(
+                self._automatic_transitions_from(self.state), self._is_possible
+            )
+
+        state_id = self._state_ids.get(self.state)
+        if state_id is None:
+            return self._global_automatic_selector(self._is_applicable)
+        return selectors[state_id](self._is_applicable)
 
     def handle_next_transition(self):
         """Handle next transition.
@@ -376,7 +673,7 @@ class StateMachine(Generic[T]):
         """
         self._outer_lock.acquire()
 
-        logger.debug("Handling next transition.")
+        self._debug("Handling next transition.")
 
         try:
             transition = self.get_next_transition()
@@ -396,13 +693,18 @@ class StateMachine(Generic[T]):
 
         while not self._stop.is_set():
             # State machine is halted and needs to be resumed before continuing.
-            self._run.wait()
+            # is_set() is checked first as it does not take the event's lock.
+            if not self._run.is_set():
+                self._run.wait()
+
+            # Cleared before evaluating transitions so that no wake-up gets lost.
+            self._wake_up.clear()
 
             try:
                 self.handle_next_transition()
             except NoTransitionAvailable:
-                logger.debug("No automatic transition available from %s." % self.state)
-                self._wait_next_state_or_stop()
+                self._debug("No automatic transition available from %s.", self.state)
+                self._wait_wake_up()
             except TransitionError as error:
                 logger.exception(error)
                 self.halt()
@@ -426,21 +728,24 @@ class StateMachine(Generic[T]):
 
         logger.debug("Exiting control loop.")
 
+        with self._worker_lock:
+            if self._worker is not None:
+                self._submitted.put(None)
+
         self.on_exit()
 
-    def _wait_next_state_or_stop(self):
-        logger.debug("Waiting for a state transition ...")
-        while not self._stop.is_set():
-            if self.wait_next_state(self._wait_interval):
-                break
-        logger.debug("Continuing after waiting for a state transition.")
+    def _wait_wake_up(self):
+        """Wait for a state change, a change in context or stop."""
+        self._debug("Waiting for a state transition ...")
+        self._wake_up.wait()
+        self._debug("Continuing after waiting for a state transition.")
 
     def _handle_error(self, error_info: ErrorInfo) -> Optional[State]:
-        logger.debug("Calling error handler.")
+        self._debug("Calling error handler.")
 
         try:
             state = self.handle_error(error_info)
-            logger.debug("Calling error handler completed successfully.")
+            self._debug("Calling error handler completed successfully.")
             return state
         except Exception as error:
             self.halt()
@@ -526,10 +831,19 @@ class StateMachine(Generic[T]):
         self._trigger(transition)
 
     def _trigger(self, transition: Transition):
+        # Whether this thread acquired _inner_lock. While on_exit() runs, the
+        # lock may be held by a thread still executing on_entry() of the
+        # current state, and that thread's lock must not be released here.
+        inner_locked = False
+        inner_lock = self._inner_lock
+        # Read once so that the checks, on_exit() and the switch see the same state.
+        current_state = self._current_state
         try:
-            logger.debug(
-                "Triggering state transition [%s]: %s → %s"
-                % (transition.name, self.state, transition.to_state)
+            self._debug(
+                "Triggering state transition [%s]: %s → %s",
+                transition.name,
+                current_state,
+                transition.to_state,
             )
 
             if not self.is_alive():
@@ -538,35 +852,38 @@ class StateMachine(Generic[T]):
             if self.is_halted():
                 raise Halted("State machine is halted.")
 
-            if not transition.can_transition_from(self.state):
+            # The composed switch and the source bitmask of a transition are
+            # bound to the state machine owning it.
+            if transition._state_machine is not self:
                 raise InvalidTransitionError(
-                    f"Invalid state transition from '{self.state}' to '{transition.to_state}'."
+                    f"Transition '{transition.name}' belongs to another state machine."
+                )
+
+            if not self._can_transition_from(transition, current_state):
+                raise InvalidTransitionError(
+                    f"Invalid state transition from '{current_state}' to '{transition.to_state}'."
                 )
 
             # Error in on_exit() prevents state transition - as well as
             # error in calling transition callback.
-            self._call_on_exit(self._current_state)
+            self._call_on_exit(current_state)
 
             # Later thread must wait until the first one gets completed.
-            self._inner_lock.acquire()
+            inner_lock.acquire()
+            inner_locked = True
             self._state_applied.clear()
 
-            self._call_transition_callback(transition)
-
-            # Set state as current state and prepare it for entry.
+            # Call transition callback, set state as current state, prepare it
+            # for entry and notify about the change in state.
             state = transition.to_state
-            previous_state = self._current_state
-
-            self._set_state(state)
-            self._call_prepare_entry(state)
-
-            # Notify about the change in state.
-            self._call_on_state_changed(previous_state, state)
-            self._notify_state_changed()
+            switch_state = transition._switch_state or self._compose_state_switch(
+                transition
+            )
+            switch_state(current_state)
         except Exception:
-            if self._inner_lock.locked():
-                self._inner_lock.release()
-            self._state_applied.set()
+            if inner_locked:
+                inner_lock.release()
+                self._state_applied.set()
             raise
         finally:
             self._outer_lock.release()
@@ -581,38 +898,98 @@ class StateMachine(Generic[T]):
 
         try:
             self._call_on_entry(state)
-            self._call_on_state_applied(state)
-
-            if state.final:
-                raise FinalStateReached  # Raising FinalStateReached for single source of truth.
+            if self._state_applied_hook:
+                self._state_applied_hook(state)
         except FinalStateReached:
             self.handle_final_state_reached()
         except Exception as error:
             logger.exception(error)
             self.halt()
 
-            error_info = ErrorInfo(
-                error=type(error),
-                value=str(error),
-                traceback="".join(format_tb(error.__traceback__)),
-            )
+            # Error info, the formatted traceback included, is created only
+            # for a custom error handler; the default one ignores it.
+            if self._error_hook:
+                error_info = ErrorInfo(
+                    error=type(error),
+                    value=str(error),
+                    traceback="".join(format_tb(error.__traceback__)),
+                )
 
-            if next_state := self._handle_error(error_info):
-                self._set_state(next_state)
+                if next_state := self._error_hook(error_info):
+                    self._set_state(next_state)
 
             raise StateError() from error
+        else:
+            # Final flag is checked directly instead of raising
+            # FinalStateReached on every entry into a final state.
+            if state.final:
+                self.handle_final_state_reached()
         finally:
             self._inner_lock.release()
             self._state_applied.set()
 
+    def _compose_state_switch(self, transition: Transition) -> Callable[[State], None]:
+        """Compose the steps switching to the transition's target state.
+
+        Steps are generated into a single function once per transition. Steps
+        that would only call a default, empty implementation are omitted:
+
+            * transition callback
+            * set state
+            * to_state.prepare_entry()
+            * on_state_changed()
+            * notify threads waiting for a state change
+        """
+        state = transition.to_state
+        namespace: dict[str, Any] = {
+            "transition": transition,
+            "state": state,
+            "set_state": self._set_state,
+            "notify_state_changed": self._notify_state_changed,
+        }
+        body = []
+
+        if transition.callback:
+            namespace["call_transition_callback"] = self._call_transition_callback
+            body.append("call_transition_callback(transition)")
+
+        body.append("set_state(state)")
+
+        if _is_overridden(state, State, "prepare_entry"):
+            namespace["call_prepare_entry"] = self._call_prepare_entry
+            body.append("call_prepare_entry(state)")
+
+        if self._state_changed_hook:
+            namespace["call_on_state_changed"] = self._state_changed_hook
+            body.append("call_on_state_changed(previous_state, state)")
+
+        body.append("notify_state_changed()")
+
+        # Generate the function source so that omitted steps cost nothing
+        # at run time - not even a branch.
+        source = "def switch_state(previous_state):\n" + "".join(
+            f"    {line}\n" for line in body
+        )
+        exec(compile(source, f"<switch state: {transition.name}>", "exec"), namespace)
+        switch_state = namespace["switch_state"]
+
+        transition._switch_state = switch_state
+        return switch_state
+
     def _set_state(self, state: State):
         previous_state = self._current_state
         self._current_state = state
-        logger.debug(f"State changed from '{previous_state}' to '{state}'.")
+        self._context_version += 1
+
+        self._debug("State changed from '%s' to '%s'.", previous_state, state)
 
     def _notify_state_changed(self):
+        # Every thread in wait_next_state() waits for this very change, so all
+        # of them are notified. Threads in wait() re-check their target states.
+        # The control loop waits on _wake_up.
         with self._state_changed_condition:
             self._state_changed_condition.notify_all()
+        self._wake_up.set()
 
     def _call_on_state_changed(self, from_state: State, to_state: State):
         try:
@@ -624,24 +1001,24 @@ class StateMachine(Generic[T]):
     def _call_transition_callback(self, transition: Transition):
         if not transition.callback:
             return
-        logger.debug("Calling '%s' callback()' ...", transition)
-        transition.callback(self.context)
-        logger.debug("Calling '%s' callback()' completed.", transition)
+        self._debug("Calling '%s' callback()' ...", transition)
+        transition.callback(self._context)
+        self._debug("Calling '%s' callback()' completed.", transition)
 
     def _call_prepare_entry(self, state: State):
-        logger.debug("Calling '%s' prepare_entry() ...", state)
-        state.prepare_entry(self.context)
-        logger.debug("Calling '%s' prepare_entry() completed.", state)
+        self._debug("Calling '%s' prepare_entry() ...", state)
+        state.prepare_entry(self._context)
+        self._debug("Calling '%s' prepare_entry() completed.", state)
 
     def _call_on_entry(self, state: State):
-        logger.debug("Calling '%s' on_entry() ...", state)
-        state.on_entry(self.context)
-        logger.debug("Calling '%s' on_entry() completed.", state)
+        self._debug("Calling '%s' on_entry() ...", state)
+        state.on_entry(self._context)
+        self._debug("Calling '%s' on_entry() completed.", state)
 
     def _call_on_exit(self, state: State):
-        logger.debug("Calling '%s' on_exit() ...", state)
-        state.on_exit(self.context)
-        logger.debug("Calling '%s' on_exit() completed.", state)
+        self._debug("Calling '%s' on_exit() ...", state)
+        state.on_exit(self._context)
+        self._debug("Calling '%s' on_exit() completed.", state)
 
     def _call_on_state_applied(self, state: State):
         try:
@@ -650,6 +1027,65 @@ class StateMachine(Generic[T]):
             logger.warning("Calling on_state_applied() caused an error: %s", error)
             logger.exception(error)
 
+    def submit(self, fn: Callable[..., object], *args) -> "Future[object]":
+        """Run a callable on the state machine's worker thread.
+
+        Allows triggering transitions from other than the calling thread
+        without creating a new thread for each call. The worker thread is
+        started on first use and it is stopped when the state machine stops.
+
+        Submitted callables are run one at a time in the submitted order.
+        A callable that blocks, e.g., a transition to a state with
+        long-lasting on_entry(), delays the callables submitted after it.
+        Errors raised by the callables are logged.
+
+        Returns a future of the callable's result. Callables that have not
+        started running when stop() is called are discarded: their futures
+        are cancelled. Wait for the futures before stopping the state machine
+        to have the callables run.
+
+        Raises:
+            NotAliveError: If the state machine is not alive or is stopping.
+
+        Example:
+            state_machine.submit(state_machine.close).result()
+        """
+        future: Future[object] = Future()
+
+        # Checked while holding the lock so that no callable is queued after
+        # the control loop has queued the worker to exit.
+        with self._worker_lock:
+            if not self.is_alive() or self._stop.is_set():
+                raise NotAliveError
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+                self._worker.start()
+            self._submitted.put((future, fn, args))
+
+        return future
+
+    def _worker_loop(self):
+        logger.debug("Worker running.")
+
+        while (item := self._submitted.get()) is not None:
+            future, fn, args = item
+            if self._stop.is_set():
+                logger.warning("State machine stopped. Discarding submitted %s.", fn)
+                future.cancel()
+                continue
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args)
+            except Exception as error:
+                logger.error("Submitted callable raised an error: %s", error)
+                logger.exception(error)
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        logger.debug("Exiting worker.")
+
     def use(self, blocking: bool = True, timeout: Optional[float] = None) -> "_Use":
         """Reserve the state machine for exclusive use by the current thread.
 
@@ -658,13 +1094,17 @@ class StateMachine(Generic[T]):
 
         Args:
             blocking (bool): If True (default), wait until the state machine becomes available.
-                             If False, return immediately if the machine is already in use.
+                             If False, fail immediately if the machine is already in use.
             timeout (float, optional): Maximum time in seconds to wait for the machine to become available.
                                        If None, wait indefinitely (when blocking=True).
 
         Returns:
             A context manager that locks the state machine for the duration of the block.
 
+        Raises:
+            StateMachineBusyError: On entering the block if the state machine could not
+                                   be reserved.
+
         Example:
             with sm.use():
                 sm.transition_from_a_to_b()
@@ -713,6 +1153,74 @@ class StateMachine(Generic[T]):
         """
 
 
+def _no_op(*args, **kwargs):
+    pass
+
+
+def _is_overridden(obj: object, base: type, name: str) -> bool:
+    """Is the named method of the object overridden from the base class."""
+    return getattr(type(obj), name) is not getattr(base, name) or name in getattr(
+        obj, "__dict__", ()
+    )
+
+
+def _compile_selector(
+    transitions: Sequence[Transition],
+    is_checked_on_dispatch: Callable[[Transition], bool],
+    can_transition: Callable[[Transition], bool],
+) -> _Selector:
+    """Generate a function selecting the first applicable transition.
+
+    Works like select_transition() but the candidate transitions are
+    unrolled into straight-line code instead of being iterated. A transition
+    using the default is_applicable() of both the transition and its target
+    state is always applicable: it is returned without the check and the
+    transitions after it are omitted. Transitions checked on dispatch are
+    checked with can_transition().
+    """
+    namespace: dict = {"logger": logger, "can_transition": can_transition}
+    lines = ["def select_transition(is_applicable):"]
+
+    for i, t in enumerate(transitions):
+        namespace[f"t{i}"] = t
+        if is_checked_on_dispatch(t):
+            check = f"can_transition(t{i})"
+        elif not _is_overridden(t, Transition, "is_applicable") and not _is_overridden(
+            t.to_state, State, "is_applicable"
+        ):
+            lines.append(f"    return t{i}")
+            break
+        else:
+            check = f"is_applicable(t{i})"
+        lines += [
+            "    try:",
+            f"        if {check}:",
+            f"            return t{i}",
+            "    except Exception as error:",
+            "        logger.exception(error)",
+        ]
+
+    else:
+        lines.append("    return None")
+    source = "\n".join(lines) + "\n"
+    exec(compile(source, "<select transition>", "exec"), namespace)
+    return namespace["select_transition"]
+
+
+def _source_mask(transition: Transition, state_ids: dict[State, int]) -> int:
+    """Get bitmask of the source state ids of transition.
+
+    All bits are set for a global transition.
+    """
+    mask = 0
+    for state in transition.from_states:
+        if isinstance(state, AnyState):
+            return -1
+        # Source states are registered by add_transition() and _freeze().
+        mask |= 1 << state_ids[state]
+    return mask
+
+
 class _Use:
     def __init__(
         self,
@@ -726,8 +1234,15 @@ class _Use:
 
     def __enter__(self):
         sm = self._state_machine
-        timeout = self._timeout if self._timeout is not None else -1
-        sm._outer_lock.acquire(blocking=self._blocking, timeout=timeout)
+        timeout = self._timeout
+        if self._blocking is False or timeout is None:
+            # Lock.acquire(): It is forbidden to specify a timeout when blocking is False.
+            timeout = -1
+        if not sm._outer_lock.acquire(blocking=self._blocking, timeout=timeout):
+            raise StateMachineBusyError(
+                f"Failed to reserve state machine (blocking={self._blocking} "
+                f"timeout={self._timeout}): Busy serving another thread."
+            )
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         sm = self._state_machine
@@ -743,14 +1258,19 @@ class _When:
     ):
         self._state_machine = state_machine
         self._states = states
+        self._target_states = states if isinstance(states, list) else [states]
         self._timeout = timeout
 
     def __enter__(self):
         sm = self._state_machine
         timer = _CountdownTimer(self._timeout)
         while sm.wait(self._states, timeout=timer.time_left):
-            if sm._outer_lock.acquire(timeout=timer.time_left or -1):
-                return sm.context
+            time_left = timer.time_left
+            if sm._outer_lock.acquire(timeout=-1 if time_left is None else time_left):
+                # State may have changed before the lock was acquired.
+                if sm.state in self._target_states:
+                    return sm.context
+                sm._outer_lock.release()
         raise TimeoutError(
             f"Waiting for {self._states} state(s) timed out in {self._timeout} seconds."
         )
@@ -763,7 +1283,7 @@ class _When:
 class _CountdownTimer:
     def __init__(self, duration: Optional[float] = None):
         self.duration = duration
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
 
     def __str__(self) -> str:
         return str(self.time_left)
@@ -772,7 +1292,7 @@ class _CountdownTimer:
     def time_left(self) -> Optional[float]:
         if self.duration is None:
             return None
-        return max(0.0, self.duration - (time.time() - self.start_time))
+        return max(0.0, self.duration - (time.monotonic() - self.start_time))
 
     def expired(self) -> bool:
         time_left = self.time_left
@@ -0,0 +1,78 @@
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator
+
+
+@dataclass(frozen=True)
+class TraceEntry:
+    """Trace log entry.
+
+    TraceEntry is created by TraceLog.entries() when the log is read.
+    """
+
+    state_id: int
+    timestamp_ns: int
+
+    @property
+    def when(self) -> str:
+        """Time of the entry in ISO 8601 format."""
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9).isoformat()
+
+
+class TraceLog:
+    """Fixed capacity log of entered states.
+
+    Records state ids and timestamps into preallocated arrays used as a ring
+    buffer. Once the log is full, the oldest entries get overwritten. Entries
+    are created and timestamps formatted only when the log is read.
+
+    Usage:
+        class Door(StateMachine[TraceLog]):
+            def on_state_changed(self, from_state: State, to_state: State):
+                self.context.record(self.state_id(to_state))
+
+        for entry in trace_log.entries():
+            print(door.states()[entry.state_id], entry.when)
+    """
+
+    def __init__(self, capacity: int = 1024):
+        if capacity < 1:
+            raise ValueError(f"Expecting positive capacity, got {capacity}.")
+        self._capacity = capacity
+        self._state_ids = array("q", [0]) * capacity
+        self._timestamps = array("q", [0]) * capacity
+        # Guards the slots and the number of recorded entries, so that
+        # concurrent record() calls neither share a slot nor lose a count.
+        self._lock = threading.Lock()
+        self._recorded = 0
+
+    def __len__(self) -> int:
+        return min(self._recorded, self._capacity)
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def record(self, state_id: int):
+        """Record an entry for the given state id."""
+        with self._lock:
+            i = self._recorded % self._capacity
+            self._state_ids[i] = state_id
+            self._timestamps[i] = time.time_ns()
+            self._recorded += 1
+
+    def entries(self) -> Iterator[TraceEntry]:
+        """Iterate entries from the oldest to the newest.
+
+        Iterates a snapshot of the log taken when the iteration starts.
+        """
+        with self._lock:
+            recorded = self._recorded
+            state_ids = self._state_ids[:]
+            timestamps = self._timestamps[:]
+        for n in range(max(0, recorded - self._capacity), recorded):
+            i = n % self._capacity
+            yield TraceEntry(state_ids[i], timestamps[i])
@@ -1,18 +1,46 @@
+from typing import TYPE_CHECKING
 from typing import Callable
 from typing import Generic
 from typing import Optional
 import itertools
 
-from . import T
+from ._typing import T
 from .state import AnyState
 from .state import State
 
+if TYPE_CHECKING:
+    from .statemachine import StateMachine
+
 
 Callback_Type = Callable[[Optional[T]], None]
 
+# AnyState holds no per-transition data, global transitions share one.
+_ANY_STATE = AnyState()
+
 
 class Transition(Generic[T]):
-    """State transition."""
+    """State transition.
+
+    Source states (from_states) are a list that can be modified until the
+    state machine is started. The state machine freezes them into a tuple
+    on start.
+    """
+
+    # __dict__ keeps subclasses and instances free to add attributes.
+    __slots__ = (
+        "from_states",
+        "to_state",
+        "automatic",
+        "name",
+        "callback",
+        "_source_mask",
+        "_switch_state",
+        "_state_machine",
+        "_applicability_key",
+        "_str",
+        "__dict__",
+        "__weakref__",
+    )
 
     _transition_counter = itertools.count(1)
 
@@ -24,14 +52,24 @@ class Transition(Generic[T]):
         automatic: bool = False,
         callback: Optional[Callback_Type] = None,
     ):
-        transition_number = next(self._transition_counter)
-        self.from_states = (
+        self.from_states: list[State] | tuple[State, ...] = (
             from_states if isinstance(from_states, list) else [from_states]
         )
         self.to_state = to_state
         self.automatic = automatic
-        self.name = name or f"T{transition_number}"
+        # Transitions are numbered only when they are not named.
+        self.name = name or f"T{next(Transition._transition_counter)}"
         self.callback = callback
+        # Bitmask of source state ids. Set by the state machine.
+        self._source_mask: Optional[int] = None
+        # Steps to switch to the target state. Composed by the state machine.
+        self._switch_state: Optional[Callable[[State], None]] = None
+        # State machine triggering the transition. Set by the state machine.
+        self._state_machine: Optional["StateMachine"] = None
+        # Key of the cached is_applicable() result. Set by the state machine.
+        self._applicability_key: object = self
+        # Cached str() with the name and the automatic flag it was formatted for.
+        self._str: tuple[Optional[str], Optional[bool], str] = (None, None, "")
 
         for state in self.from_states:
             if not isinstance(state, State):
@@ -41,22 +79,27 @@ class Transition(Generic[T]):
             raise ValueError(f"Expecting State, got {to_state}.")
 
     def __str__(self):
-        return f"{self.name} [auto]" if self.automatic else f"{self.name} [manual]"
+        name, automatic, text = self._str
+        if name is not self.name or automatic is not self.automatic:
+            name, automatic = self.name, self.automatic
+            text = f"{name} [auto]" if automatic else f"{name} [manual]"
+            self._str = (name, automatic, text)
+        return text
 
     def __call__(self, blocking: bool = True, timeout: Optional[float] = None):
         """Triggers the transition.
 
         Calls trigger() internally.
         """
-        self.trigger(blocking=blocking, timeout=timeout)
+        self.trigger(blocking, timeout)
 
     def trigger(self, blocking: bool = True, timeout: Optional[float] = None):
         """Trigger the transition.
 
         Internally calls state machine's trigger().
         """
-        # This method is a replaced by the state machine with the actual
-        # implementation.
+        if self._state_machine is not None:
+            self._state_machine.trigger(self, blocking, timeout)
 
     def can_transition_from(self, from_state: State) -> bool:
         """Is transition possible from given state to target state."""
@@ -77,6 +120,8 @@ class GlobalTransition(Transition):
     State transition from any state to given state.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         to_state: State,
@@ -85,7 +130,7 @@ class GlobalTransition(Transition):
         callback: Optional[Callback_Type] = None,
     ):
         super().__init__(
-            from_states=AnyState(),
+            from_states=_ANY_STATE,
             to_state=to_state,
             automatic=automatic,
             name=name,
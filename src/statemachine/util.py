@@ -0,0 +1,44 @@
+import random
+from typing import Optional
+
+
+class BitStream:
+    """Stream of random booleans that are True with the given probability.
+
+    Draws 64 random bits at a time with random.getrandbits() and consumes
+    them a byte per call. Each byte is compared against a threshold computed
+    once from the probability, so the probability is applied at 1/256
+    resolution. This is considerably cheaper than calling random.random()
+    or random.randrange() for every probe, e.g. in is_applicable().
+
+    Usage:
+        ready = BitStream(p=0.25)
+
+        class Processing(State):
+            def is_applicable(self, context) -> bool:
+                return ready.next()
+
+    BitStream is not thread-safe; use one stream per thread.
+    """
+
+    _BITS = 8
+    _PER_DRAW = 64 // _BITS
+    _MASK = (1 << _BITS) - 1
+
+    def __init__(self, p: float = 0.5, rng: Optional[random.Random] = None):
+        if not 0.0 <= p <= 1.0:
+            raise ValueError(f"Expecting probability between 0 and 1, got {p}.")
+        self._threshold = round(p * (1 << self._BITS))
+        self._getrandbits = (rng or random).getrandbits
+        self._bits = 0
+        self._left = 0
+
+    def next(self) -> bool:
+        """Get the next random boolean."""
+        if not self._left:
+            self._bits = self._getrandbits(64)
+            self._left = self._PER_DRAW
+        value = self._bits & self._MASK
+        self._bits >>= self._BITS
+        self._left -= 1
+        return value < self._threshold
@@ -32,6 +32,20 @@ def test_setting_context():
     assert sm.context is context
 
 
+def test_replacing_context():
+    class ReadyState(State[Context]):
+        def is_applicable(self, context: Context) -> bool:
+            return context.value > 0
+
+    sm = StateMachine(Context())
+    sm.connect(sm.initial_state, ReadyState(), automatic=True)
+    assert sm.get_next_transition() is None
+
+    # Result cached for the replaced context is not used.
+    sm.context = Context(value=1)
+    assert sm.get_next_transition() is not None
+
+
 def test_state_hooks():
     value = 42
     context = Context(value=value)
@@ -1,3 +1,4 @@
+from statemachine import AnyState
 from statemachine import State
 
 
@@ -22,3 +23,10 @@ def test_calling_handlers():
     s.is_applicable(None)
     s.on_entry(None)
     s.on_exit(None)
+
+
+def test_hash():
+    a, b, any_state = State("A"), State("A"), AnyState()
+    assert len({a, b, any_state}) == 3
+    assert {a: 1}[a] == 1
+    assert {any_state: 1}[any_state] == 1
@@ -1,5 +1,6 @@
 import threading
 import time
+from dataclasses import dataclass
 
 import pytest
 
@@ -11,6 +12,7 @@ from statemachine import InvalidTransitionError
 from statemachine import NotAliveError
 from statemachine import State
 from statemachine import StateMachine
+from statemachine import Transition
 
 
 class FailingState(State):
@@ -111,6 +113,21 @@ def test_on_state_changed_callback():
     sm.join()
 
 
+def test_on_state_applied_callback():
+    class MyStateMachine(ABStateMachine):
+        applied_state = None
+
+        def on_state_applied(self, state: State):
+            self.applied_state = state
+
+    sm = MyStateMachine()
+    sm.start()
+    sm.ab()
+    sm.join()
+
+    assert sm.applied_state is sm.b
+
+
 def test_start():
     sm = ABStateMachine()
     sm.start()
@@ -233,11 +250,287 @@ def test_wait():
     threading.Thread(target=wait_c, daemon=True).start()
 
     sm.ab()
-    time.sleep(0.1)
-    assert not state_c_is_set_correctly.is_set()
+    assert not state_c_is_set_correctly.wait(0.1)
 
     sm.bc()
-    time.sleep(0.1)
-    assert state_c_is_set_correctly.is_set()
+    assert state_c_is_set_correctly.wait(1.0)
 
     sm.join()
+
+
+def test_wait_current_state():
+    sm = ABCStateMachine()
+
+    # Current state is waited without blocking, before start too.
+    assert sm.wait(sm.state, 0.0) == True
+    assert sm.wait([sm.a, sm.b], 0.0) == False
+
+
+def test_wait_after_state_change_hooks():
+    events = []
+
+    class MyStateMachine(ABCStateMachine):
+        def on_state_changed(self, from_state: State, to_state: State):
+            time.sleep(0.05)
+            events.append("changed")
+
+    sm = MyStateMachine()
+    sm.start()
+
+    def wait_b():
+        sm.wait(sm.b, 1.0)
+        events.append("waited")
+
+    waiter = threading.Thread(target=wait_b, daemon=True)
+    waiter.start()
+    time.sleep(0.05)
+    sm.ab()
+    waiter.join(1.0)
+
+    assert events == ["changed", "waited"]
+    sm.stop()
+    assert sm.join(1.0) == True
+
+
+def test_state_ids():
+    sm = ABCStateMachine()
+
+    assert sm.state_id(sm.a) == 0
+    assert sm.state_id(sm.b) == 1
+    assert sm.state_id(sm.c) == 2
+    assert sm.states()[1] is sm.b
+    assert sm.state_id(State()) is None
+
+    # States can be connected to several state machines, ids are per machine.
+    other = StateMachine()
+    other.connect(sm.c, sm.a)
+    assert other.state_id(sm.c) == 0
+    assert sm.state_id(sm.c) == 2
+
+
+def test_foreign_state():
+    other = ABCStateMachine()
+
+    class MyStateMachine(StateMachine):
+        def __init__(self):
+            super().__init__()
+
+            self.a = State()
+            self.b = FailingState()
+            self.ab = self.connect(self.a, self.b)
+            self.initial_state = self.a
+
+        def handle_error(self, error_info: ErrorInfo):
+            # A state connected to another state machine, with the same id as b.
+            return other.b
+
+    sm = MyStateMachine()
+    sm.start()
+
+    with pytest.raises(StateError):
+        sm.ab()
+
+    assert sm.state is other.b
+    assert sm.wait(sm.b, 0.0) == False
+    assert sm.wait(other.b, 0.0) == True
+    sm.resume()
+    sm.stop()
+    assert sm.join(1.0) == True
+
+
+def test_transition_of_another_state_machine():
+    sm1 = ABCStateMachine()
+    sm2 = ABCStateMachine()
+    sm1.start()
+    sm2.start()
+
+    # Source state ids are the same in both, the states are not.
+    with pytest.raises(InvalidTransitionError):
+        sm2.trigger(sm1.ab)
+    assert sm2.can_transition(sm1.ab) == False
+    assert sm2.state is sm2.a
+
+    # Switch to the target state is bound to the owning state machine.
+    with pytest.raises(InvalidTransitionError):
+        sm2.trigger(sm1.reset)
+    sm1.ab()
+    assert sm1.state is sm1.b
+    assert sm2.state is sm2.a
+
+    with pytest.raises(ConfigurationError):
+        StateMachine().add_transition(sm1.ab)
+
+    for sm in (sm1, sm2):
+        sm.stop()
+        assert sm.join(1.0) == True
+
+
+def test_applicability_cache():
+    class CountingState(State):
+        def __init__(self):
+            super().__init__()
+            self.count = 0
+
+        def is_applicable(self, context) -> bool:
+            self.count += 1
+            return False
+
+    sm = StateMachine()
+    b = CountingState()
+    sm.connect(sm.initial_state, b, automatic=True)
+
+    assert sm.get_next_transition() is None
+    assert sm.get_next_transition() is None
+    assert b.count == 1
+
+    sm.context_changed()
+    assert sm.get_next_transition() is None
+    assert b.count == 2
+
+    # Transitions into the same state share the cached result.
+    sm.connect_any(b, automatic=True)
+    sm.context_changed()
+    assert sm.get_next_transition() is None
+    assert b.count == 3
+
+
+def test_overridden_can_transition_from():
+    class Never(Transition):
+        def can_transition_from(self, from_state: State) -> bool:
+            return False
+
+    class Always(Transition):
+        def can_transition_from(self, from_state: State) -> bool:
+            return True
+
+    sm = StateMachine()
+    a, b, c = State(), State(), FinalState()
+    sm.connect(sm.initial_state, a, automatic=True)
+    sm.add_transition(Never(a, b, automatic=True))
+    sm.add_transition(Always(b, c, automatic=True))
+    sm.start()
+
+    # Never is skipped and Always is taken from a state it does not list.
+    assert sm.join(1.0) == True
+    assert sm.state is c
+
+
+def test_overridden_can_transition():
+    class Blocking(StateMachine):
+        def can_transition(self, transition: Transition) -> bool:
+            return super().can_transition(transition) and transition.to_state is not b
+
+    sm = Blocking()
+    a, b = State(), FinalState()
+    sm.connect(sm.initial_state, a, automatic=True)
+    sm.connect(a, b, automatic=True)
+    sm.start()
+
+    assert sm.wait(a, 1.0)
+    assert sm.get_next_transition() is None
+    assert sm.join(0.1) == False
+
+    sm.stop()
+    assert sm.join(1.0) == True
+
+
+def test_context_changed():
+    @dataclass
+    class Context:
+        ready: bool = False
+
+    class ReadyState(FinalState):
+        def is_applicable(self, context: Context) -> bool:
+            return context.ready
+
+    context = Context()
+    sm = StateMachine(context)
+    sm.connect(sm.initial_state, ReadyState(), automatic=True)
+    sm.start()
+
+    assert sm.join(0.1) == False
+
+    context.ready = True
+    sm.context_changed()
+
+    assert sm.join(1.0) == True
+
+
+def test_connect_after_start():
+    sm = ABStateMachine()
+    sm.start()
+
+    with pytest.raises(AlreadyStartedError):
+        sm.connect(sm.b, sm.a)
+
+    sm.stop()
+    assert sm.join(1.0) == True
+
+
+def test_submit():
+    sm = ABStateMachine()
+
+    with pytest.raises(NotAliveError):
+        sm.submit(sm.ab)
+
+    sm.start()
+    assert sm.submit(sm.ab).result(1.0) is None
+
+    assert sm.join(1.0) == True
+    assert sm.state is sm.b
+
+    with pytest.raises(NotAliveError):
+        sm.submit(sm.ab)
+
+
+def test_submit_discarded_on_stop():
+    started = threading.Event()
+    release = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(2.0)
+        return "done"
+
+    sm = ABStateMachine()
+    sm.start()
+    running = sm.submit(block)
+    pending = sm.submit(sm.ab)
+    assert started.wait(1.0)
+
+    sm.stop()
+    release.set()
+
+    assert sm.join(1.0) == True
+    assert running.result() == "done"
+    assert pending.cancelled()
+    assert sm.state is sm.a
+
+
+def test_on_exit_error_while_entering():
+    entered = threading.Event()
+    release = threading.Event()
+
+    class SlowState(State):
+        def on_entry(self, context):
+            entered.set()
+            release.wait(2.0)
+
+        def on_exit(self, context):
+            raise ValueError("on_exit failed")
+
+    sm = StateMachine()
+    a, b = SlowState(), State()
+    sm.connect(sm.initial_state, a, automatic=True)
+    a_to_b = sm.connect(a, b)
+    sm.start()
+    assert entered.wait(2.0)
+
+    with pytest.raises(ValueError):
+        a_to_b()
+
+    # Lock held by the thread running on_entry() is kept.
+    assert sm._inner_lock.locked()
+    release.set()
+    sm.stop()
+    assert sm.join(2.0)
@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+from statemachine import TraceLog
+
+
+def test_record():
+    log = TraceLog(capacity=4)
+    assert len(log) == 0
+
+    log.record(1)
+    log.record(2)
+
+    entries = list(log.entries())
+    assert [e.state_id for e in entries] == [1, 2]
+    assert entries[0].timestamp_ns <= entries[1].timestamp_ns
+    assert entries[0].when.startswith("20")
+
+
+def test_capacity():
+    log = TraceLog(capacity=2)
+
+    for state_id in range(5):
+        log.record(state_id)
+
+    assert len(log) == 2
+    assert [e.state_id for e in log.entries()] == [3, 4]
+
+    with pytest.raises(ValueError):
+        TraceLog(capacity=0)
+
+
+def test_concurrent_record():
+    log = TraceLog(capacity=10_000)
+
+    def record():
+        for _ in range(1000):
+            log.record(1)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(log) == 4000
+    assert len(list(log.entries())) == 4000
@@ -67,3 +67,19 @@ def test_callback():
     assert sm.callback_value == False
     sm.ab()
     assert sm.callback_value == True
+
+
+def test_from_states_modified_before_start():
+    sm = MyStateMachine()
+    d = State()
+    sm.bc.from_states.append(sm.a)
+    sm.bc.from_states.append(d)
+    sm.start()
+
+    assert sm.bc.from_states == (sm.b, sm.a, d)
+    assert sm.state_id(d) is not None
+    sm.wait(sm.c, 1.0)
+    assert sm.state is sm.c
+
+    sm.stop()
+    assert sm.join(1.0) == True
@@ -1,6 +1,6 @@
 import threading
 import pytest
-from statemachine import StateMachine, State
+from statemachine import StateMachine, State, StateMachineBusyError
 
 
 class Machine(StateMachine):
@@ -71,3 +71,27 @@ def test_thread_safety_with_use(state_machine):
 def test_state_change_callback(state_machine):
     state_machine.a_to_b()
     assert state_machine.last_transition == (state_machine.a, state_machine.b)
+
+
+def test_use_busy(state_machine):
+    reserved = threading.Event()
+    release = threading.Event()
+
+    def reserve():
+        with state_machine.use():
+            reserved.set()
+            release.wait(2.0)
+
+    thread = threading.Thread(target=reserve)
+    thread.start()
+    assert reserved.wait(2.0)
+
+    with pytest.raises(StateMachineBusyError):
+        with state_machine.use(blocking=False):
+            pass
+    with pytest.raises(StateMachineBusyError):
+        with state_machine.use(timeout=0.01):
+            pass
+
+    release.set()
+    thread.join(2.0)
@@ -0,0 +1,19 @@
+import random
+
+import pytest
+
+from statemachine.util import BitStream
+
+
+def test_bit_stream():
+    bits = BitStream(p=0.25, rng=random.Random(1))
+    hits = sum(bits.next() for _ in range(10000))
+    assert 2200 < hits < 2800
+
+    assert not any(BitStream(p=0.0).next() for _ in range(100))
+    assert all(BitStream(p=1.0).next() for _ in range(100))
+
+
+def test_bit_stream_probability():
+    with pytest.raises(ValueError):
+        BitStream(p=1.5)